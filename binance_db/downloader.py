@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Enhanced downloader with improved task tracking and status management
+"""
+
+import io
+import os
+import time
+import shutil
+import logging
+import asyncio
+import zipfile
+import aiohttp
+import aiofiles
+import threading
+from typing import Dict, Any
+
+# Use ISA-L's SIMD-accelerated DEFLATE for ZIP extraction when available
+# (isal_zlib is zlib API compatible; ~2-3x faster decompression on x86-64)
+try:
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+except ImportError:
+    pass
+
+# Optional multi-threaded gzip decoding for large bundles
+try:
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
+# Only bother spinning up parallel decompression for members this large
+_PARALLEL_GZ_MIN_SIZE = 32 * 1024 * 1024
+
+# Bodies larger than this spill to the disk path even in stream_extract
+# mode, keeping peak RSS at ~concurrency x spill size instead of
+# concurrency x body size when oversized archives show up
+_STREAM_SPILL_SIZE = 64 * 1024 * 1024
+from .logger_setup import get_logger
+from .utils import (
+    ensure_directory_exists,
+    format_file_size,
+    read_file_smart,
+    write_checksum_sidecar,
+    verify_checksum_sidecar
+)
+from .task_tracker import TaskTracker, TaskStatus
+
+
+class QPSController:
+    """
+    Token bucket based QPS controller for high-concurrency scenarios
+    Allows bursts while maintaining average rate limit
+    """
+    
+    def __init__(self, max_qps: float):
+        self.max_qps = max_qps
+        self.bucket_size = max(max_qps * 2, 10)  # Allow burst up to 2 seconds worth
+        self.tokens = self.bucket_size
+        self.last_refill = time.time()
+        self._lock = threading.Lock()
+        
+    def _refill_tokens(self):
+        """Refill tokens based on elapsed time"""
+        now = time.time()
+        elapsed = now - self.last_refill
+        tokens_to_add = elapsed * self.max_qps
+        self.tokens = min(self.bucket_size, self.tokens + tokens_to_add)
+        self.last_refill = now
+    
+    async def acquire(self):
+        """
+        Wait if necessary to maintain the configured QPS, yielding to the
+        event loop instead of blocking a worker thread
+        """
+        if self.max_qps <= 0:
+            return
+
+        while True:
+            with self._lock:
+                self._refill_tokens()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                # No tokens available, calculate wait time
+                wait_time = (1 - self.tokens) / self.max_qps
+
+            # Sleep outside the lock, yielding to other coroutines
+            await asyncio.sleep(wait_time)
+
+
+class BinanceDataDownloader:
+    """
+    Enhanced downloader with file-level task tracking and three-state status management
+    """
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.logger = get_logger()
+        self.base_url = config['base_url']
+        self.output_dir = config['output_directory']
+        
+        # Download settings
+        download_config = config.get('download', {})
+        self.retry_attempts = download_config.get('retry_attempts', 3)
+        self.retry_delay = download_config.get('retry_delay', 5)
+        
+        # QPS control - support both old and new config format
+        if 'max_requests_per_second' in download_config:
+            max_qps = download_config.get('max_requests_per_second', 10.0)
+        else:
+            # Legacy support: convert rate_limit_delay to QPS
+            rate_limit_delay = download_config.get('rate_limit_delay', 0.1)
+            max_qps = 1.0 / rate_limit_delay if rate_limit_delay > 0 else 10.0
+        
+        self.qps_controller = QPSController(max_qps)
+        # 256KB chunks batch ~32x fewer writes per MB than the old 8KB default
+        self.chunk_size = download_config.get('chunk_size', 262144)
+        self.max_workers = download_config.get('max_concurrent_downloads', 3)
+
+        # File processing settings
+        file_config = config.get('file_processing', {})
+        self.auto_extract = file_config.get('auto_extract', True)
+        self.delete_zip = file_config.get('delete_zip_after_extract', True)
+        # Extract straight from the in-memory response instead of writing the
+        # ZIP to disk first (daily files are small, ~1-20MB)
+        self.stream_extract = file_config.get('stream_extract', True)
+        self.min_file_size = file_config.get('min_file_size', 100)
+        # Write/check .sha256 sidecars so a truncated CSV from an interrupted
+        # run is re-downloaded instead of silently treated as complete
+        self.verify_checksums = file_config.get('verify_checksums', True)
+        # Decode large .gz members (monthly bundles) on all cores via rapidgzip
+        self.parallel_decompress = file_config.get('parallel_decompress', False)
+
+        # Shared aiohttp session (created lazily inside the event loop)
+        self.session = None
+
+        # Per-directory manifest of complete-looking CSV names, built with one
+        # os.scandir pass instead of a stat syscall per candidate file
+        self._complete_cache = {}
+
+    def _dir_manifest(self, file_dir: str) -> set:
+        """
+        Get (and lazily build) the set of complete CSV names in a directory
+        """
+        manifest = self._complete_cache.get(file_dir)
+        if manifest is None:
+            try:
+                with os.scandir(file_dir) as entries:
+                    manifest = {
+                        entry.name for entry in entries
+                        if entry.is_file() and entry.stat().st_size >= self.min_file_size
+                    }
+            except OSError:
+                manifest = set()  # Directory doesn't exist yet
+            self._complete_cache[file_dir] = manifest
+        return manifest
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get or create the shared aiohttp session (must be called inside the event loop)
+        """
+        if self.session is None or self.session.closed:
+            # Keep spare keep-alive connections beyond the worker count so the
+            # pool never cycles sockets (and re-pays TLS handshakes) mid-run
+            connector = aiohttp.TCPConnector(
+                limit=self.max_workers * 4,
+                limit_per_host=self.max_workers * 2,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                # Per-operation limits, not total: a slow transfer of a large
+                # archive must be allowed to run longer than 30s as long as
+                # bytes keep arriving
+                timeout=aiohttp.ClientTimeout(sock_connect=30, sock_read=30),
+                headers={'User-Agent': 'Binance-Data-Downloader/2.0'}
+            )
+        return self.session
+
+    async def download_file_task(self, task, tracker: TaskTracker) -> TaskStatus:
+        """
+        Download a single file task with improved error handling and status tracking
+        """
+        symbol = task.symbol
+        data_type = task.data_type
+        date = task.date
+        interval = task.interval
+        url = task.url
+        file_dir = task.file_dir
+        zip_path = task.zip_path
+        csv_path = task.csv_path
+        zip_filename = task.zip_filename
+        csv_filename = task.csv_filename
+        
+        try:
+            # Resume fast-path: O(1) manifest lookup instead of a stat call
+            # (catches files the pre-filter missed, e.g. written earlier in
+            # this run by an overlapping task)
+            if csv_filename in self._dir_manifest(file_dir):
+                # Hashing runs in a worker thread so in-flight transfers on
+                # the event loop are never stalled behind it
+                if not self.verify_checksums or await asyncio.to_thread(verify_checksum_sidecar, csv_path):
+                    return TaskStatus.SKIPPED
+                # Sidecar mismatch: the existing CSV is corrupt or truncated
+                self.logger.warning("Checksum mismatch, re-downloading: %s", csv_filename)
+                os.remove(csv_path)
+                self._dir_manifest(file_dir).discard(csv_filename)
+
+            # Ensure directory exists (memoized in utils)
+            ensure_directory_exists(file_dir)
+
+            # Download with retry mechanism
+            for attempt in range(self.retry_attempts):
+                try:
+                    self.logger.debug("Downloading [%d/%d]: %s", attempt + 1, self.retry_attempts, zip_filename)
+
+                    # Apply QPS control
+                    await self.qps_controller.acquire()
+
+                    # Resume a partial .zip left by an interrupted run instead of
+                    # re-fetching from byte 0 (only applies to the disk path)
+                    resume_offset = 0
+                    request_headers = {}
+                    if not (self.auto_extract and self.stream_extract) and os.path.exists(zip_path):
+                        resume_offset = os.path.getsize(zip_path)
+                        if resume_offset > 0:
+                            request_headers['Range'] = f'bytes={resume_offset}-'
+
+                    session = await self._get_session()
+                    async with session.get(url, headers=request_headers) as response:
+                        # Handle 404 errors (file doesn't exist for this date/symbol)
+                        if response.status == 404:
+                            error_msg = f"Data not available (404): {url}"
+                            self.logger.warning(error_msg)
+                            tracker.set_task_status(
+                                symbol, data_type, date, TaskStatus.FAILED,
+                                interval, error_msg
+                            )
+                            return TaskStatus.FAILED  # Don't retry for 404
+
+                        downloaded_size = 0
+                        zip_buffer = None
+
+                        if response.status == 416 and resume_offset > 0:
+                            # 416 for our resume offset means the .zip on disk
+                            # is already the full file - nothing left to read,
+                            # go straight to extraction
+                            self.logger.debug("Existing ZIP already complete (416): %s", zip_filename)
+                        else:
+                            response.raise_for_status()
+
+                            # Download file
+                            total_size = int(response.headers.get('content-length', 0))
+                            stream_to_memory = (self.auto_extract and self.stream_extract
+                                                and total_size < _STREAM_SPILL_SIZE)
+                            if stream_to_memory:
+                                # Keep the payload in memory and skip the intermediate .zip file
+                                zip_buffer = io.BytesIO()
+                                async for chunk in response.content.iter_chunked(self.chunk_size):
+                                    if chunk:
+                                        zip_buffer.write(chunk)
+                                        downloaded_size += len(chunk)
+                            else:
+                                # Append when the CDN honoured the Range request;
+                                # a plain 200 means restart from scratch
+                                write_mode = 'ab' if resume_offset > 0 and response.status == 206 else 'wb'
+                                async with aiofiles.open(zip_path, write_mode) as f:
+                                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                                        if chunk:
+                                            await f.write(chunk)
+                                            downloaded_size += len(chunk)
+
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("Downloaded %s: %s", format_file_size(downloaded_size), zip_filename)
+
+                    # Extract if enabled - 确保原子性操作
+                    if self.auto_extract:
+                        # 尝试解压，如果失败就清理不完整的文件
+                        try:
+                            if zip_buffer is not None:
+                                zip_buffer.seek(0)
+                                extracted = await asyncio.to_thread(self._extract_zip_file, zip_buffer, file_dir)
+                            else:
+                                extracted = await asyncio.to_thread(self._extract_zip_file, zip_path, file_dir)
+
+                            if extracted:
+                                self.logger.debug("Extracted: %s", csv_filename)
+
+                                # 验证解压后的文件确实存在
+                                if os.path.exists(csv_path):
+                                    # Delete ZIP file if configured (only written in the disk path)
+                                    if self.delete_zip and zip_buffer is None:
+                                        os.remove(zip_path)
+                                        self.logger.debug("Deleted ZIP file: %s", zip_filename)
+                                    
+                                    # Record sha256 + size so future resumes can
+                                    # distinguish complete files from truncated
+                                    # ones (hashed off the event loop, like
+                                    # extraction)
+                                    if self.verify_checksums:
+                                        await asyncio.to_thread(write_checksum_sidecar, csv_path)
+
+                                    # 解压成功，不需要保存状态（依赖文件存在即可）
+                                    self._complete_cache.setdefault(file_dir, set()).add(csv_filename)
+                                    return TaskStatus.COMPLETED
+                                else:
+                                    # ZIP解压说成功但文件不存在，清理并标记失败
+                                    if os.path.exists(zip_path):
+                                        os.remove(zip_path)
+                                    error_msg = f"Extraction successful but CSV file missing: {csv_filename}"
+                                    self.logger.error(error_msg)
+                                    tracker.set_task_status(
+                                        symbol, data_type, date, TaskStatus.FAILED,
+                                        interval, error_msg
+                                    )
+                                    return TaskStatus.FAILED
+                            else:
+                                # 解压失败，清理不完整的文件
+                                if os.path.exists(zip_path):
+                                    os.remove(zip_path)
+                                if os.path.exists(csv_path):
+                                    os.remove(csv_path)  # 清理可能损坏的CSV
+                                error_msg = f"Failed to extract: {zip_filename}"
+                                self.logger.error(error_msg)
+                                tracker.set_task_status(
+                                    symbol, data_type, date, TaskStatus.FAILED,
+                                    interval, error_msg
+                                )
+                                return TaskStatus.FAILED
+                        except Exception as e:
+                            # 解压过程中出现异常，清理所有相关文件
+                            try:
+                                if os.path.exists(zip_path):
+                                    os.remove(zip_path)
+                                if os.path.exists(csv_path):
+                                    os.remove(csv_path)
+                            except:
+                                pass  # 清理失败也不影响
+                            error_msg = f"Exception during extraction: {e}"
+                            self.logger.error(error_msg)
+                            tracker.set_task_status(
+                                symbol, data_type, date, TaskStatus.FAILED,
+                                interval, error_msg
+                            )
+                            return TaskStatus.FAILED
+                    else:
+                        # No extraction, just mark download as completed
+                        file_size = os.path.getsize(zip_path) if os.path.exists(zip_path) else 0
+                        tracker.set_task_status(
+                            symbol, data_type, date, TaskStatus.COMPLETED,
+                            interval, file_size=file_size
+                        )
+                        return TaskStatus.COMPLETED
+                    
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error_msg = f"Download attempt {attempt + 1} failed: {e}"
+                    self.logger.warning(error_msg)
+                    if attempt < self.retry_attempts - 1:
+                        self.logger.debug("Retrying in %s seconds...", self.retry_delay)
+                        await asyncio.sleep(self.retry_delay)
+                    else:
+                        final_error = f"All download attempts failed for: {url}"
+                        self.logger.error(final_error)
+                        tracker.set_task_status(
+                            symbol, data_type, date, TaskStatus.FAILED,
+                            interval, final_error
+                        )
+                        return TaskStatus.FAILED
+                        
+                except Exception as e:
+                    error_msg = f"Unexpected error during download: {e}"
+                    self.logger.error(error_msg)
+                    tracker.set_task_status(
+                        symbol, data_type, date, TaskStatus.FAILED,
+                        interval, error_msg
+                    )
+                    return TaskStatus.FAILED
+            
+            # Should not reach here
+            tracker.set_task_status(
+                symbol, data_type, date, TaskStatus.FAILED,
+                interval, "Unknown download failure"
+            )
+            return TaskStatus.FAILED
+            
+        except Exception as e:
+            error_msg = f"Error in download_file_task: {e}"
+            self.logger.error(error_msg)
+            tracker.set_task_status(
+                symbol, data_type, date, TaskStatus.FAILED,
+                interval, error_msg
+            )
+            return TaskStatus.FAILED
+    
+    def _extract_zip_file(self, zip_src, extract_dir: str) -> bool:
+        """
+        Extract ZIP file (path or in-memory file object) and handle potential errors
+        """
+        try:
+            if isinstance(zip_src, str):
+                # Memory-map archives on disk so ZipFile reads straight from
+                # the page cache instead of through a user-space copy
+                with read_file_smart(zip_src) as buf:
+                    return self._extract_zip_file(buf, extract_dir)
+
+            with zipfile.ZipFile(zip_src, 'r') as zip_ref:
+                # 调试：查看ZIP文件内容
+                file_list = zip_ref.namelist()
+                self.logger.debug("ZIP contains files: %s", file_list)
+                
+                # Extract each member to a .part file and os.replace it into
+                # place: a crash mid-extract can never leave a partial file
+                # under the final name, so the resume skip check stays sound
+                for name in file_list:
+                    if name.endswith('/'):
+                        continue
+                    final_path = os.path.join(extract_dir, name)
+                    ensure_directory_exists(os.path.dirname(final_path))
+                    tmp_path = final_path + '.part'
+                    with zip_ref.open(name) as src, open(tmp_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    os.replace(tmp_path, final_path)
+
+                # Daily archives only contain CSVs; monthly bundles may ship
+                # gzipped members worth decoding on all cores
+                if self.parallel_decompress and rapidgzip is not None:
+                    for name in file_list:
+                        if name.endswith('.gz'):
+                            self._parallel_gunzip(os.path.join(extract_dir, name))
+
+                # 调试：查看解压后的文件 (the directory walk is only worth
+                # doing when DEBUG output is actually enabled)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    extracted_files = []
+                    for root, dirs, files in os.walk(extract_dir):
+                        for file in files:
+                            if file.endswith('.csv'):
+                                extracted_files.append(os.path.join(root, file))
+
+                    self.logger.debug("Extracted CSV files: %s", extracted_files)
+                
+            return True
+        except zipfile.BadZipFile:
+            self.logger.error(f"Corrupted ZIP file: {zip_src}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Failed to extract {zip_src}: {e}")
+            return False
+
+    def _parallel_gunzip(self, gz_path: str):
+        """
+        Decompress an extracted .gz member in place using all cores
+        """
+        if os.path.getsize(gz_path) < _PARALLEL_GZ_MIN_SIZE:
+            return
+
+        out_path = gz_path[:-3]
+        with rapidgzip.open(gz_path, parallelization=0) as src:
+            with open(out_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(gz_path)
+        self.logger.debug("Parallel-decompressed: %s", out_path)
+
+    async def close(self):
+        """
+        Close the session
+        """
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
\ No newline at end of file
@@ -1,5 +1,6 @@
 import logging
 import os
+import re
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
@@ -7,6 +8,20 @@ from datetime import datetime
 _logger_initialized = False
 _logger_instance = None
 
+# Accepts "10MB", "1 GB", "512kb", "100B", ...
+_SIZE_RE = re.compile(r'^\s*(\d+)\s*([KMG]?B)\s*$', re.I)
+_SIZE_MULTIPLIERS = {'B': 1, 'KB': 1024, 'MB': 1 << 20, 'GB': 1 << 30}
+
+
+def _parse_file_size(size_str, default=10 * 1024 * 1024):
+    """
+    Parse a human-readable size like "10MB" into bytes
+    """
+    match = _SIZE_RE.match(str(size_str))
+    if not match:
+        return default
+    return int(match.group(1)) * _SIZE_MULTIPLIERS[match.group(2).upper()]
+
 
 def setup_logger(config):
     """
@@ -31,10 +46,7 @@ def setup_logger(config):
     backup_count = logging_config.get('backup_count', 5)
     
     # Convert max_file_size to bytes
-    size_multiplier = {'KB': 1024, 'MB': 1024*1024, 'GB': 1024*1024*1024}
-    size_unit = max_file_size[-2:].upper()
-    size_value = int(max_file_size[:-2])
-    max_bytes = size_value * size_multiplier.get(size_unit, 1024*1024)
+    max_bytes = _parse_file_size(max_file_size)
     
     # Create logger
     logger = logging.getLogger('binance_downloader')
@@ -11,25 +11,21 @@ See LICENSE file for details.
 """
 
 import sys
-import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 from typing import List, Dict, Any
 from tqdm import tqdm
 
-# Add src directory to path for imports
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from .logger_setup import setup_logger, get_logger
+from .utils import load_config, ensure_directory_exists
+from .task_tracker import TaskTracker, TaskStatus
+from .task_generator import generate_file_level_tasks, DownloadTask
+from .downloader import BinanceDataDownloader
 
-from logger_setup import setup_logger, get_logger
-from utils import load_config, ensure_directory_exists
-from task_tracker import TaskTracker, TaskStatus
-from task_generator import generate_file_level_tasks
-from downloader import BinanceDataDownloader
 
-
-def execute_download_task(downloader: BinanceDataDownloader, 
-                         task: Dict[str, Any], 
-                         tracker: TaskTracker, 
+async def execute_download_task(downloader: BinanceDataDownloader,
+                         task: DownloadTask,
+                         tracker: TaskTracker,
                          pbar: tqdm,
                          stats: Dict[str, Any]) -> TaskStatus:
     """
@@ -37,29 +33,28 @@ def execute_download_task(downloader: BinanceDataDownloader,
     """
     try:
         start_time = time.time()
-        result = downloader.download_file_task(task, tracker)
+        result = await downloader.download_file_task(task, tracker)
         end_time = time.time()
-        
-        # Update speed statistics
-        with stats['lock']:
-            stats['completed_count'] += 1
-            stats['total_time'] += (end_time - start_time)
-            
-            # Calculate current speed (files per second)
-            elapsed_total = time.time() - stats['start_time']
-            current_speed = stats['completed_count'] / elapsed_total if elapsed_total > 0 else 0
-            
-            # Calculate ETA
-            remaining = pbar.total - stats['completed_count']
-            eta_seconds = remaining / current_speed if current_speed > 0 else 0
-            eta_str = f"{int(eta_seconds//3600):02d}:{int((eta_seconds%3600)//60):02d}:{int(eta_seconds%60):02d}"
-            
-            # Update progress bar with enhanced info
-            pbar.set_postfix_str(f"Speed: {current_speed:.1f} files/s | ETA: {eta_str}")
-        
+
+        # Update speed statistics (single-threaded event loop, no lock needed)
+        stats['completed_count'] += 1
+        stats['total_time'] += (end_time - start_time)
+
+        # Calculate current speed (files per second)
+        elapsed_total = time.time() - stats['start_time']
+        current_speed = stats['completed_count'] / elapsed_total if elapsed_total > 0 else 0
+
+        # Calculate ETA
+        remaining = pbar.total - stats['completed_count']
+        eta_seconds = remaining / current_speed if current_speed > 0 else 0
+        eta_str = f"{int(eta_seconds//3600):02d}:{int((eta_seconds%3600)//60):02d}:{int(eta_seconds%60):02d}"
+
+        # Update progress bar with enhanced info
+        pbar.set_postfix_str(f"Speed: {current_speed:.1f} files/s | ETA: {eta_str}")
+
         pbar.update(1)
         return result
-        
+
     except Exception as e:
         logger = get_logger()
         logger.error(f"Task execution error: {e}")
@@ -67,44 +62,76 @@ def execute_download_task(downloader: BinanceDataDownloader,
         return TaskStatus.FAILED
 
 
-def run_enhanced_downloads(config: Dict[str, Any], tasks: List[Dict[str, Any]], tracker: TaskTracker):
+async def _run_downloads_async(config: Dict[str, Any], tasks: List[DownloadTask],
+                               tracker: TaskTracker, pbar: tqdm,
+                               stats: Dict[TaskStatus, int],
+                               progress_stats: Dict[str, Any]):
+    """
+    Drive all download tasks concurrently on the event loop, bounded by a semaphore
+    """
+    logger = get_logger()
+    max_workers = config.get("download", {}).get("max_concurrent_downloads", 3)
+
+    downloader = BinanceDataDownloader(config)
+    sem = asyncio.Semaphore(max_workers)
+
+    async def bounded(task):
+        async with sem:
+            return await execute_download_task(downloader, task, tracker, pbar, progress_stats)
+
+    try:
+        completed_count = 0
+        for coro in asyncio.as_completed([bounded(task) for task in tasks]):
+            try:
+                result = await coro
+                stats[result] += 1
+                completed_count += 1
+
+                # Save progress periodically (every 100 tasks) instead of every task
+                if completed_count % 100 == 0:
+                    tracker.save_progress()
+                    logger.debug(f"Progress saved after {completed_count} completed tasks")
+
+            except Exception as e:
+                logger.error(f"Task future error: {e}")
+                stats[TaskStatus.FAILED] += 1
+    finally:
+        await downloader.close()
+
+
+def run_enhanced_downloads(config: Dict[str, Any], tasks: List[DownloadTask], tracker: TaskTracker):
     """
     Run downloads with enhanced tracking and progress display
     """
     logger = get_logger()
-    
+
     if not tasks:
         logger.info("No tasks to download")
         return
-    
+
     # Create output directories
     ensure_directory_exists(config["output_directory"])
     ensure_directory_exists(config["log_directory"])
-    
-    # Initialize downloader
-    downloader = BinanceDataDownloader(config)
-    
+
     # Get concurrency settings
     max_workers = config.get("download", {}).get("max_concurrent_downloads", 3)
-    
-    # Enhanced statistics with threading support
-    import threading
+
+    # Enhanced statistics
     stats = {status: 0 for status in TaskStatus}
     progress_stats = {
         'completed_count': 0,
         'total_time': 0.0,
-        'start_time': time.time(),
-        'lock': threading.Lock()
+        'start_time': time.time()
     }
-    
+
     logger.info(f"Starting {len(tasks)} download tasks with {max_workers} concurrent workers")
     logger.info(f"Target QPS: {config.get('download', {}).get('max_requests_per_second', 'unlimited')}")
-    
+
     try:
         # Get UI settings
         ui_config = config.get('ui', {})
         progress_bar_width = ui_config.get('progress_bar_width', 100)
-        
+
         # Create enhanced progress bar
         with tqdm(
             total=len(tasks),
@@ -114,44 +141,23 @@ def run_enhanced_downloads(config: Dict[str, Any], tasks: List[Dict[str, Any]],
             leave=True,
             bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {postfix}]'
         ) as pbar:
-            
-            # Execute downloads with thread pool
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks with enhanced stats
-                future_to_task = {
-                    executor.submit(execute_download_task, downloader, task, tracker, pbar, progress_stats): task 
-                    for task in tasks
-                }
-                
-                # Process completed tasks
-                completed_count = 0
-                for future in as_completed(future_to_task):
-                    task = future_to_task[future]
-                    try:
-                        result = future.result()
-                        stats[result] += 1
-                        completed_count += 1
-                        
-                        # Save progress periodically (every 100 tasks) instead of every task
-                        if completed_count % 100 == 0:
-                            tracker.save_progress()
-                            logger.debug(f"Progress saved after {completed_count} completed tasks")
-                            
-                    except Exception as e:
-                        logger.error(f"Task future error: {e}")
-                        stats[TaskStatus.FAILED] += 1
-    
+
+            # Execute downloads on an asyncio event loop
+            asyncio.run(_run_downloads_async(config, tasks, tracker, pbar, stats, progress_stats))
+
     finally:
-        downloader.close()
         # Final save
         tracker.save_progress()
     
-    # Final summary
+    # Final summary - one log call so the block passes through the logging
+    # lock and handlers once instead of per line
     total_processed = sum(stats.values())
-    logger.info("=== Download Session Summary ===")
-    logger.info(f"Total files processed: {total_processed}")
-    logger.info(f"Completed: {stats[TaskStatus.COMPLETED]} ({stats[TaskStatus.COMPLETED]/total_processed*100:.1f}%)")
-    logger.info(f"Failed: {stats[TaskStatus.FAILED]} ({stats[TaskStatus.FAILED]/total_processed*100:.1f}%)")
+    logger.info("\n".join([
+        "=== Download Session Summary ===",
+        f"Total files processed: {total_processed}",
+        f"Completed: {stats[TaskStatus.COMPLETED]} ({stats[TaskStatus.COMPLETED]/total_processed*100:.1f}%)",
+        f"Failed: {stats[TaskStatus.FAILED]} ({stats[TaskStatus.FAILED]/total_processed*100:.1f}%)",
+    ]))
     
     # Show overall statistics including skipped files
     tracker.print_summary()
@@ -4,51 +4,79 @@ Enhanced task generator with file-level granularity and pre-filtering
 """
 
 import os
-from pathlib import Path
-from typing import List, Dict, Any, Set
-from concurrent.futures import ThreadPoolExecutor
-from logger_setup import get_logger
-from utils import (
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Set
+from .logger_setup import get_logger
+from .utils import (
+    KLINE_TYPES,
+    TYPES_WITH_DATATYPE,
     generate_date_range,
     get_all_trading_pairs,
     build_download_url,
     get_output_filename,
-    get_file_directory
+    get_file_directory,
+    is_file_complete,
+    verify_checksum_sidecar
 )
-from task_tracker import TaskTracker, TaskStatus
+from .task_tracker import TaskTracker, TaskStatus
 
 
-def batch_check_files_exist(file_paths: List[str], max_workers: int = 8) -> Set[str]:
+@dataclass(slots=True, frozen=True)
+class DownloadTask:
     """
-    Batch check file existence using thread pool for I/O parallelization
-    Returns set of existing file paths
+    File-level download task - slotted so 100k+ instances stay cheap
+    compared to per-task dicts
     """
+    symbol: str
+    data_type: str
+    date: str
+    interval: Optional[str]
+    url: str
+    file_dir: str
+    zip_filename: str
+    csv_filename: str
+    zip_path: str
+    csv_path: str
+
+
+def batch_check_files_exist(file_paths: List[str], min_size: int = 100,
+                            verify_checksums: bool = True) -> Set[str]:
+    """
+    Batch check file existence with one os.scandir() per directory
+    Returns set of existing (complete-looking) file paths
+    """
+    # Group candidates by directory so each directory is read exactly once
+    paths_by_dir: Dict[str, List[str]] = {}
+    for path in file_paths:
+        paths_by_dir.setdefault(os.path.dirname(path), []).append(path)
+
     existing_files = set()
-    
-    def check_file(path: str) -> str:
+    for directory, paths in paths_by_dir.items():
         try:
-            if Path(path).is_file():
-                return path
-        except:
-            pass
-        return None
-    
-    # Use thread pool for I/O bound file checking
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = executor.map(check_file, file_paths)
-        existing_files = {path for path in results if path is not None}
-    
+            with os.scandir(directory) as entries:
+                sizes = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+        except OSError:
+            continue  # Directory doesn't exist yet - nothing downloaded there
+
+        for path in paths:
+            size = sizes.get(os.path.basename(path))
+            if size is not None and is_file_complete(path, min_size, size=size):
+                # Shallow sidecar check (size only): deep-hashing every
+                # existing file would make the pre-filter O(total dataset
+                # bytes) on each startup; the downloader still deep-compares
+                # anything that reaches its per-task skip path
+                if not verify_checksums or verify_checksum_sidecar(path, size=size, deep=False):
+                    existing_files.add(path)
+
     return existing_files
 
 
-def build_task_fast(symbol: str, data_type: str, date: str, interval: str, 
-                   base_url: str, output_dir: str) -> Dict[str, Any]:
+def build_task_fast(symbol: str, data_type: str, date: str, interval: str,
+                   base_url: str, output_dir: str) -> DownloadTask:
     """
     Fast task building with correct filename logic (matching utils.py)
     """
     # Build paths inline for better performance - CORRECTED LOGIC
-    types_with_datatype = ["metrics", "bookDepth"]
-    
     if interval:
         # K线类型的URL构建: {data_type}/{symbol}/{interval}/{symbol}-{interval}-{date}.zip
         url_part = f"{data_type}/{symbol}/{interval}/{symbol}-{interval}-{date}.zip"
@@ -60,7 +88,7 @@ def build_task_fast(symbol: str, data_type: str, date: str, interval: str,
         url_part = f"{data_type}/{symbol}/{symbol}-{data_type}-{date}.zip"
         file_subdir = f"{data_type}/{symbol}"
         # 根据类型决定文件名格式
-        if data_type in types_with_datatype:
+        if data_type in TYPES_WITH_DATATYPE:
             filename_base = f"{symbol}-{data_type}-{date}"
         else:
             filename_base = f"{symbol}-{data_type}-{date}"
@@ -72,14 +100,14 @@ def build_task_fast(symbol: str, data_type: str, date: str, interval: str,
     zip_path = os.path.join(file_dir, zip_filename)
     csv_path = os.path.join(file_dir, csv_filename)
     
-    return {
-        'symbol': symbol, 'data_type': data_type, 'date': date, 'interval': interval,
-        'url': url, 'file_dir': file_dir, 'zip_filename': zip_filename,
-        'csv_filename': csv_filename, 'zip_path': zip_path, 'csv_path': csv_path
-    }
+    return DownloadTask(
+        symbol=symbol, data_type=data_type, date=date, interval=interval,
+        url=url, file_dir=file_dir, zip_filename=zip_filename,
+        csv_filename=csv_filename, zip_path=zip_path, csv_path=csv_path
+    )
 
 
-def generate_file_level_tasks(config: Dict[str, Any], tracker: TaskTracker) -> List[Dict[str, Any]]:
+def generate_file_level_tasks(config: Dict[str, Any], tracker: TaskTracker) -> List[DownloadTask]:
     """
     High-performance task generation with batch file checking and optimized path building
     """
@@ -120,7 +148,7 @@ def generate_file_level_tasks(config: Dict[str, Any], tracker: TaskTracker) -> L
                 if not enabled:
                     continue
                 
-                if data_type in ['indexPriceKlines', 'klines', 'markPriceKlines', 'premiumIndexKlines']:
+                if data_type in KLINE_TYPES:
                     if kline_intervals:
                         for interval in kline_intervals:
                             task = build_task_fast(symbol, data_type, date, interval, base_url, output_dir)
@@ -135,8 +163,12 @@ def generate_file_level_tasks(config: Dict[str, Any], tracker: TaskTracker) -> L
     
     # Batch file existence check for maximum performance
     logger.info("Batch checking file existence...")
-    all_csv_paths = [task['csv_path'] for task in all_tasks]
-    existing_files = batch_check_files_exist(all_csv_paths, max_workers=16)
+    all_csv_paths = [task.csv_path for task in all_tasks]
+    file_config = config.get('file_processing', {})
+    min_file_size = file_config.get('min_file_size', 100)
+    verify_checksums = file_config.get('verify_checksums', True)
+    existing_files = batch_check_files_exist(all_csv_paths, min_size=min_file_size,
+                                             verify_checksums=verify_checksums)
     logger.info(f"Found {len(existing_files)} existing files")
     
     # Fast pre-filtering using set lookup
@@ -146,29 +178,24 @@ def generate_file_level_tasks(config: Dict[str, Any], tracker: TaskTracker) -> L
     failed_retry_count = 0
     
     for task in all_tasks:
-        csv_path = task['csv_path']
-        
         # Fast set lookup instead of individual file checks
-        if csv_path in existing_files:
+        if task.csv_path in existing_files:
             skipped_count += 1
             continue
-        
+
         # Only check task status for files that don't exist
-        symbol = task['symbol']
-        data_type = task['data_type']
-        date = task['date']
-        interval = task.get('interval')
-        
-        current_status = tracker.get_task_status(symbol, data_type, date, interval)
+        current_status = tracker.get_task_status(task.symbol, task.data_type, task.date, task.interval)
         if current_status == TaskStatus.FAILED:
             failed_retry_count += 1
         
         pre_filtered_tasks.append(task)
     
-    logger.info(f"Pre-filtering results:")
-    logger.info(f"  - Skipped (already complete): {skipped_count}")
-    logger.info(f"  - Failed tasks for retry: {failed_retry_count}")
-    logger.info(f"  - Tasks needing download: {len(pre_filtered_tasks)}")
+    logger.info("\n".join([
+        "Pre-filtering results:",
+        f"  - Skipped (already complete): {skipped_count}",
+        f"  - Failed tasks for retry: {failed_retry_count}",
+        f"  - Tasks needing download: {len(pre_filtered_tasks)}",
+    ]))
     
     # Only save if there are failed tasks to track
     if failed_retry_count > 0:
@@ -10,7 +10,7 @@ import threading
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Set
 from enum import Enum
-from logger_setup import get_logger
+from .logger_setup import get_logger
 
 
 class TaskStatus(Enum):
@@ -217,10 +217,14 @@ class TaskTracker:
         total = sum(stats.values())
         
         if total > 0:
-            self.logger.info("=== Task Status Summary ===")
-            self.logger.info(f"Total tasks: {total}")
-            self.logger.info(f"Pending: {stats[TaskStatus.PENDING]} ({stats[TaskStatus.PENDING]/total*100:.1f}%)")
-            self.logger.info(f"Skipped: {stats[TaskStatus.SKIPPED]} ({stats[TaskStatus.SKIPPED]/total*100:.1f}%)")  
-            self.logger.info(f"Completed: {stats[TaskStatus.COMPLETED]} ({stats[TaskStatus.COMPLETED]/total*100:.1f}%)")
-            self.logger.info(f"Failed: {stats[TaskStatus.FAILED]} ({stats[TaskStatus.FAILED]/total*100:.1f}%)")
-            self.logger.info(f"Tracking file: {self.tracking_file}")
\ No newline at end of file
+            # Emit the whole block as one record: a single pass through the
+            # logging lock/handlers instead of seven
+            self.logger.info("\n".join([
+                "=== Task Status Summary ===",
+                f"Total tasks: {total}",
+                f"Pending: {stats[TaskStatus.PENDING]} ({stats[TaskStatus.PENDING]/total*100:.1f}%)",
+                f"Skipped: {stats[TaskStatus.SKIPPED]} ({stats[TaskStatus.SKIPPED]/total*100:.1f}%)",
+                f"Completed: {stats[TaskStatus.COMPLETED]} ({stats[TaskStatus.COMPLETED]/total*100:.1f}%)",
+                f"Failed: {stats[TaskStatus.FAILED]} ({stats[TaskStatus.FAILED]/total*100:.1f}%)",
+                f"Tracking file: {self.tracking_file}",
+            ]))
\ No newline at end of file
@@ -0,0 +1,509 @@
+import io
+import os
+import mmap
+import time
+import socket
+import hashlib
+import requests
+import threading
+import functools
+import contextlib
+import yaml
+import pandas as pd
+from datetime import datetime
+
+# Rust SIMD JSON parser - worth 3-10x on the ~4MB exchangeInfo payload
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from typing import List, Dict, Any
+from .logger_setup import get_logger
+
+
+class RateLimiter:
+    """
+    Token bucket for Binance REST request weight (1200 weight/min per IP);
+    staying under the ceiling avoids 429/418 backoff storms and IP bans
+    """
+
+    def __init__(self, capacity: float = 1100, refill_per_sec: float = 1100 / 60):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.last_refill = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int = 1):
+        """Block until `weight` tokens are available, then consume them"""
+        while True:
+            with self._lock:
+                now = time.time()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.last_refill) * self.refill_per_sec)
+                self.last_refill = now
+
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+
+                wait_time = (weight - self.tokens) / self.refill_per_sec
+
+            # Sleep outside the lock so other callers can refill/consume
+            time.sleep(wait_time)
+
+
+# Shared limiter for all Binance REST API calls from this process
+_api_limiter = RateLimiter()
+
+# Endpoint weight of GET /fapi/v1/exchangeInfo
+_EXCHANGE_INFO_WEIGHT = 1
+
+# Module-level session shared by all synchronous API helpers so repeated
+# calls reuse one TCP+TLS connection instead of re-handshaking
+_shared_session = None
+
+
+def get_shared_session() -> requests.Session:
+    """Get the lazily-created shared requests session"""
+    global _shared_session
+    if _shared_session is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        _shared_session = requests.Session()
+        _shared_session.headers.update({
+            'User-Agent': 'Binance-Data-Downloader/2.0',
+            'Accept': 'application/json'
+        })
+        # Generous pool so every sync caller reuses warm TLS connections,
+        # plus transparent retries with backoff for transient server errors
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                # 429/418 are handled explicitly with Retry-After awareness
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
+        _shared_session.mount('https://', adapter)
+    return _shared_session
+
+
+# libyaml's C parser is ~10x faster than the pure-Python default
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config_cached(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    with open(config_path, "r", encoding="utf-8") as file:
+        return yaml.load(file, Loader=_YAML_LOADER)
+
+
+def prewarm(hosts=('data.binance.vision', 'fapi.binance.com')) -> None:
+    """Warm the OS DNS cache and the shared session's connection pool
+
+    Resolves each host and issues a throwaway HEAD so the first real
+    request doesn't pay the DNS lookup + TLS handshake. All errors are
+    swallowed - this is purely an optimization.
+    """
+    session = get_shared_session()
+    for host in hosts:
+        try:
+            socket.getaddrinfo(host, 443)
+            session.head(f'https://{host}/', timeout=2)
+        except Exception:
+            pass
+
+
+def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
+    """Load configuration from YAML file (memoized; keyed on path + mtime so
+    an edited file is re-parsed while repeat loads cost one stat)"""
+    config_path = os.path.abspath(config_path)
+    return _load_config_cached(config_path, os.stat(config_path).st_mtime_ns)
+
+
+# Directories already created by this process - per-symbol/per-date layouts
+# hit the same paths thousands of times, and each makedirs stats every
+# path component
+_made_dirs = set()
+
+
+def ensure_directory_exists(directory: str) -> None:
+    """Create directory if it doesn't exist (memoized per process)"""
+    directory = os.fspath(directory)
+    if directory in _made_dirs:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _made_dirs.add(directory)
+
+
+def is_file_complete(file_path: str, min_size: int = 100, size: int = None) -> bool:
+    """Check whether a downloaded CSV looks complete without reading the whole file
+
+    Pass `size` if the file size is already known (e.g. from a DirEntry)
+    to skip the stat call.
+    """
+    if size is None:
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            return False
+
+    if size < min_size:
+        return False
+
+    # A complete CSV has at least a header plus one data row: look for a
+    # second newline in a small prefix instead of scanning the whole file
+    with open(file_path, 'rb') as f:
+        head = f.read(4096)
+
+    first_newline = head.find(b'\n')
+    if first_newline == -1:
+        # Single line longer than the prefix; trust the size check
+        return size > len(head)
+
+    return b'\n' in head[first_newline + 1:] or size > len(head)
+
+
+# Below this size a plain read() beats the page-table setup cost of mmap
+_MMAP_MIN_SIZE = 1024 * 1024
+
+
+class _MmapReader:
+    """Minimal file-object facade over a read-only mmap
+
+    mmap.mmap has read/seek/tell but only grew seekable() in Python 3.13,
+    so consumers like zipfile.ZipFile reject the bare mapping on earlier
+    versions.
+    """
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def read(self, n: int = -1) -> bytes:
+        return self._mapped.read(n)
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        return self._mapped.seek(pos, whence)
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return False
+
+
+@contextlib.contextmanager
+def read_file_smart(file_path: str):
+    """Open a file for whole-content random-access reading
+
+    Yields a seekable file-like buffer: io.BytesIO for files under 1MB
+    (where read() wins) and a read-only mmap above that, so large archives
+    are served straight from the page cache without a user-space copy.
+    The mapping is closed when the context exits.
+    """
+    size = os.stat(file_path).st_size
+    if size < _MMAP_MIN_SIZE:
+        with open(file_path, 'rb') as f:
+            yield io.BytesIO(f.read())
+        return
+
+    with open(file_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield _MmapReader(mapped)
+        finally:
+            mapped.close()
+
+
+def _hash_file(file_path: str) -> str:
+    """sha256 of a file via hashlib.file_digest: streams in C, releases the
+    GIL, and uses OpenSSL (SHA-NI on supporting x86-64) instead of a Python
+    chunk loop"""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def write_checksum_sidecar(file_path: str) -> None:
+    """Record sha256 + size in a `<file>.sha256` sidecar for resume verification"""
+    size = os.stat(file_path).st_size
+    with open(file_path + '.sha256', 'w') as f:
+        f.write(f"{_hash_file(file_path)} {size}\n")
+
+
+def verify_checksum_sidecar(file_path: str, size: int = None, deep: bool = True) -> bool:
+    """Validate a file against its `.sha256` sidecar
+
+    The size acts as a cheap stat gate: a mismatch fails immediately
+    without reading the file (a different length can never reproduce the
+    recorded digest). On a match, `deep=True` pays for the full sha256
+    comparison while `deep=False` trusts the recorded size - bulk callers
+    sweeping an entire dataset use the latter so verification stays
+    O(files), not O(bytes). Files without a sidecar (e.g. downloads that
+    predate checksumming) pass unchallenged. Pass `size` if already known
+    (e.g. from a DirEntry) to skip the stat.
+    """
+    try:
+        with open(file_path + '.sha256', 'r') as f:
+            recorded_digest, recorded_size = f.read().split()
+        recorded_size = int(recorded_size)
+    except (OSError, ValueError):
+        return True
+
+    if size is None:
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            return False
+
+    if size != recorded_size:
+        return False
+
+    return _hash_file(file_path) == recorded_digest if deep else True
+
+
+def generate_date_range(start_date: str, end_date: str) -> List[str]:
+    """Generate list of dates between start_date and end_date (inclusive)"""
+    if end_date.lower() == "latest":
+        end_date = datetime.now().strftime("%Y-%m-%d")
+
+    # Single C-level loop instead of building one datetime per day in Python
+    return pd.date_range(start_date, end_date, freq="D").strftime("%Y-%m-%d").tolist()
+
+
+def get_all_trading_pairs() -> List[str]:
+    """Get all available trading pairs with local file priority"""
+    import json
+    from pathlib import Path
+    import time
+    
+    logger = get_logger()
+
+    # BINANCE_DB_REFRESH_PAIRS=1 bypasses both local files and the TTL cache
+    # for callers that need up-to-the-minute listings
+    refresh_requested = bool(os.environ.get('BINANCE_DB_REFRESH_PAIRS'))
+
+    # First try local symbols.json file
+    symbols_file = Path("symbols.json")
+    if symbols_file.exists() and not refresh_requested:
+        try:
+            with open(symbols_file, 'r') as f:
+                symbols_data = json.load(f)
+                symbols = symbols_data.get('symbols', [])
+                if symbols:
+                    logger.info(f"Using local symbols.json: {len(symbols)} symbols")
+                    return symbols
+        except Exception as e:
+            logger.debug(f"Failed to load symbols.json: {e}")
+    
+    # Fallback to cache file path
+    cache_file = Path("trading_pairs_cache.json")
+    cache_duration = 24 * 3600  # 24 hours in seconds
+    
+    # Try to load from cache
+    if cache_file.exists() and not refresh_requested:
+        try:
+            with open(cache_file, 'r') as f:
+                cache_data = json.load(f)
+                cache_time = cache_data.get('timestamp', 0)
+                
+                # Check if cache is still valid (less than 24 hours old)
+                if time.time() - cache_time < cache_duration:
+                    symbols = cache_data.get('symbols', [])
+                    if symbols:
+                        logger.info(f"Using cached trading pairs: {len(symbols)} symbols")
+                        return symbols
+        except Exception as e:
+            logger.debug(f"Failed to load cached trading pairs: {e}")
+    
+    # Cache invalid or doesn't exist, fetch from API
+    logger.info("Fetching trading pairs from Binance API...")
+    
+    # Multiple retry attempts with escalating timeouts on the shared session
+    session = get_shared_session()
+    for attempt in range(3):
+        try:
+            url = "https://fapi.binance.com/fapi/v1/exchangeInfo"
+
+            # Consume the endpoint's weight before hitting the API so looped
+            # or parallel callers can't blow the per-IP weight budget
+            _api_limiter.acquire(_EXCHANGE_INFO_WEIGHT)
+
+            if attempt < 2:
+                response = session.get(url, timeout=15 + attempt * 5)
+            else:
+                # Last attempt with longer timeout and SSL verification disabled
+                import urllib3
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+                response = session.get(url, timeout=30, verify=False)
+
+            used_weight = response.headers.get('X-MBX-USED-WEIGHT-1M')
+            if used_weight:
+                logger.debug(f"Binance API used weight (1m): {used_weight}")
+
+            # Rate limited / about to be banned: honour Retry-After, then let
+            # the normal retry/stale-cache handling take over
+            if response.status_code in (429, 418):
+                retry_after = int(response.headers.get('Retry-After', 1))
+                logger.warning(f"Rate limited ({response.status_code}), backing off {retry_after}s")
+                time.sleep(retry_after)
+                raise requests.exceptions.RetryError(f"Rate limited ({response.status_code})")
+
+            response.raise_for_status()
+            if orjson is not None:
+                data = orjson.loads(response.content)
+            else:
+                data = response.json()
+            
+            symbols = sorted(
+                symbol["symbol"]
+                for symbol in data["symbols"]
+                if symbol["status"] == "TRADING" and
+                   symbol["contractType"] == "PERPETUAL" and
+                   symbol["quoteAsset"] == "USDT"
+            )
+            
+            # Save to cache (write to a temp file + atomic rename so a crash
+            # mid-write can never leave a truncated cache behind)
+            try:
+                cache_data = {
+                    'timestamp': time.time(),
+                    'symbols': symbols
+                }
+                tmp_file = cache_file.with_suffix('.json.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(cache_data, f, indent=2)
+                os.replace(tmp_file, cache_file)
+                logger.info(f"Cached {len(symbols)} trading pairs")
+            except Exception as e:
+                logger.debug(f"Failed to save trading pairs cache: {e}")
+            
+            return symbols
+            
+        except Exception as e:
+            logger.debug(f"Attempt {attempt + 1} failed: {e}")
+            if attempt < 2:  # Not the last attempt
+                time.sleep(2 ** attempt)  # Exponential backoff
+            else:
+                # Last attempt failed, try to use stale cache or fallback
+                if cache_file.exists():
+                    try:
+                        with open(cache_file, 'r') as f:
+                            cache_data = json.load(f)
+                            symbols = cache_data.get('symbols', [])
+                            if symbols:
+                                logger.info(f"API failed, using stale cache: {len(symbols)} symbols")
+                                return symbols
+                    except Exception:
+                        pass
+                
+                # Try fallback trading pairs file
+                fallback_file = Path("fallback_trading_pairs.json")
+                if fallback_file.exists():
+                    try:
+                        with open(fallback_file, 'r') as f:
+                            fallback_data = json.load(f)
+                            symbols = fallback_data.get('symbols', [])
+                            if symbols:
+                                logger.info(f"API and cache failed, using fallback list: {len(symbols)} symbols")
+                                return symbols
+                    except Exception as fe:
+                        logger.debug(f"Failed to load fallback trading pairs: {fe}")
+                
+                raise Exception(f"Failed to fetch trading pairs from Binance Futures API after 3 attempts: {e}")
+
+
+# Kline-style data types take an interval and share the same URL/file layout
+KLINE_TYPES = frozenset({"indexPriceKlines", "klines", "markPriceKlines", "premiumIndexKlines"})
+
+# Only these types keep the data-type tag in the extracted CSV filename
+TYPES_WITH_DATATYPE = frozenset({"metrics", "bookDepth"})
+
+# Precompiled URL templates (one per data type) so build_download_url does a
+# single dict lookup + format instead of re-testing membership on every call
+_KLINE_URL_TEMPLATE = "{base}{data_type}/{symbol}/{interval}/{symbol}-{interval}-{date}.zip"
+_DEFAULT_URL_TEMPLATE = "{base}{data_type}/{symbol}/{symbol}-{data_type}-{date}.zip"
+_URL_TEMPLATES = {data_type: _KLINE_URL_TEMPLATE for data_type in KLINE_TYPES}
+
+
+def build_download_url(base_url: str, data_type: str, symbol: str, date: str, interval: str = None) -> str:
+    """Build download URL based on data type and parameters"""
+    template = _URL_TEMPLATES.get(data_type, _DEFAULT_URL_TEMPLATE)
+    if template is _KLINE_URL_TEMPLATE and interval is None:
+        raise ValueError(f"Interval is required for {data_type}")
+    return template.format(base=base_url, data_type=data_type, symbol=symbol, date=date, interval=interval)
+
+
+def get_output_filename(symbol: str, data_type: str, date: str, interval: str = None, extension: str = "csv") -> str:
+    """Generate output filename for processed data (matching Binance's actual filename format)"""
+    # 只有 metrics 和 bookDepth 在文件名中包含数据类型标识
+    if data_type in TYPES_WITH_DATATYPE:
+        # 带数据类型标识：symbol-datatype-date 格式
+        return f"{symbol}-{data_type}-{date}.{extension}"
+    elif interval:
+        # 有interval的类型（K线类型）：symbol-interval-date 格式
+        return f"{symbol}-{interval}-{date}.{extension}"
+    else:
+        # 其他没有interval的类型：symbol-datatype-date 格式
+        return f"{symbol}-{data_type}-{date}.{extension}"
+
+
+def format_file_size(size_bytes: int) -> str:
+    """Format file size in human readable format"""
+    if size_bytes == 0:
+        return "0B"
+
+    size_names = ["B", "KB", "MB", "GB", "TB"]
+    i = 0
+    while size_bytes >= 1024 and i < len(size_names) - 1:
+        size_bytes /= 1024.0
+        i += 1
+
+    return f"{size_bytes:.2f}{size_names[i]}"
+
+
+def get_file_directory(data_type: str, symbol: str, interval: str = None, base_dir: str = "./data") -> str:
+    """Get the directory path for storing files"""
+    if interval:
+        return os.path.join(base_dir, data_type, symbol, interval)
+    else:
+        return os.path.join(base_dir, data_type, symbol)
+
+
+def expected_csv_paths(config: Dict[str, Any]) -> List[str]:
+    """Deterministic CSV paths a fully-complete run of `config` would produce
+
+    Lets callers gate work behind a cheap exists() sweep. Returns [] when
+    the config doesn't pin trading_pairs, since resolving the full pair
+    list would need an API call.
+    """
+    trading_pairs = config.get("trading_pairs") or []
+    if not trading_pairs:
+        return []
+
+    time_range = config["time_range"]
+    dates = generate_date_range(time_range["start_date"], time_range["end_date"])
+    kline_intervals = config.get("kline_intervals", [])
+    output_dir = config["output_directory"]
+
+    paths = []
+    for symbol in trading_pairs:
+        for data_type, enabled in config["data_types"].items():
+            if not enabled:
+                continue
+            intervals = kline_intervals if data_type in KLINE_TYPES else [None]
+            for interval in intervals:
+                file_dir = get_file_directory(data_type, symbol, interval, output_dir)
+                for date in dates:
+                    filename = get_output_filename(symbol, data_type, date, interval)
+                    paths.append(os.path.join(file_dir, filename))
+    return paths
\ No newline at end of file
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures - session-scoped so config parsing, logger setup
+and HTTP connection state are paid once for the whole suite
+"""
+
+import os
+
+import pytest
+
+from binance_db.logger_setup import setup_logger
+from binance_db.utils import load_config, get_shared_session, prewarm
+
+_TEST_DIR = os.path.dirname(__file__)
+
+
+@pytest.fixture(scope="session")
+def config():
+    return load_config(os.path.join(_TEST_DIR, 'test_enhanced_config.yaml'))
+
+
+@pytest.fixture(scope="session")
+def logger(config):
+    return setup_logger(config)
+
+
+@pytest.fixture(scope="session")
+def http_session():
+    # Warm DNS + TLS once; every test then reuses the pooled connections
+    prewarm()
+    return get_shared_session()
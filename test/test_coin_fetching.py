@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for trading pair fetching
+"""
+
+import sys
+
+from binance_db.utils import get_all_trading_pairs
+
+
+# Pairs that should always be present on Binance USDT-M futures
+COMMON_PAIRS = ["BTCUSDT", "ETHUSDT", "BNBUSDT"]
+
+
+def check_coin_fetching():
+    """Fetch trading pairs and verify the common pairs are present (0 = pass)"""
+    try:
+        pairs = get_all_trading_pairs()
+        print(f"Fetched {len(pairs)} trading pairs")
+
+        if not pairs:
+            print("✗ No trading pairs returned")
+            return 1
+
+        # O(1) membership tests instead of scanning the 400+ entry list,
+        # and one print for the whole report instead of one per pair
+        pairs_set = frozenset(pairs)
+        missing = [pair for pair in COMMON_PAIRS if pair not in pairs_set]
+        print(f"Missing common pairs: {missing or 'none'}")
+
+        if missing:
+            print(f"⚠ Coin fetching test FAILED: {len(missing)} common pairs missing")
+            return 1
+
+        print("✓ Coin fetching test PASSED")
+        return 0
+
+    except Exception as e:
+        print(f"Critical test error: {e}")
+        return 1
+
+
+def test_coin_fetching(http_session):
+    assert check_coin_fetching() == 0
+
+
+if __name__ == "__main__":
+    sys.exit(check_coin_fetching())
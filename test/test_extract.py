@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for ZIP extraction (local only, no network needed)
+"""
+
+import os
+import sys
+import tempfile
+import zipfile
+
+from binance_db.downloader import BinanceDataDownloader
+from binance_db.utils import _MMAP_MIN_SIZE
+
+_CONFIG = {
+    'base_url': 'https://data.binance.vision/data/futures/um/daily/',
+    'output_directory': './test_data',
+    'download': {},
+    'file_processing': {},
+}
+
+
+def check_large_zip_extraction():
+    """Extract a >1MB on-disk archive - exercises the mmap path (0 = pass)"""
+    try:
+        downloader = BinanceDataDownloader(_CONFIG)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            csv_name = 'BTCUSDT-1h-2024-08-01.csv'
+            rows = ''.join(f"{i},{i * 2}\n" for i in range(200_000))
+
+            # ZIP_STORED keeps the archive above the mmap threshold
+            zip_path = os.path.join(work_dir, 'BTCUSDT-1h-2024-08-01.zip')
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as archive:
+                archive.writestr(csv_name, rows)
+
+            if os.path.getsize(zip_path) < _MMAP_MIN_SIZE:
+                print("✗ Test archive unexpectedly below the mmap threshold")
+                return 1
+
+            if not downloader._extract_zip_file(zip_path, work_dir):
+                print("✗ Extraction returned False")
+                return 1
+
+            extracted_path = os.path.join(work_dir, csv_name)
+            if not os.path.exists(extracted_path) or os.path.getsize(extracted_path) != len(rows):
+                print("✗ Extracted CSV missing or wrong size")
+                return 1
+
+            if any(name.endswith('.part') for name in os.listdir(work_dir)):
+                print("✗ Leftover .part files after extraction")
+                return 1
+
+        print("✓ Large archive extraction test PASSED")
+        return 0
+
+    except Exception as e:
+        print(f"Critical test error: {e}")
+        return 1
+
+
+def test_large_zip_extraction():
+    assert check_large_zip_extraction() == 0
+
+
+if __name__ == "__main__":
+    sys.exit(check_large_zip_extraction())